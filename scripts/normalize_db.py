@@ -3,10 +3,12 @@
 Normalize Aircraft Registry
 
 This script normalizes all aircraft types in the database using the aircraft_type_normalizer module.
-It updates the normalized_type column for all aircraft in the registry.
+It updates the normalized_type column for aircraft in the registry. Only rows
+without a normalized_type are processed unless --all is given (use --all after
+changing the normalization rules).
 
 Usage:
-    python scripts/normalize_db.py /path/to/tailleader.sqlite [--dry-run]
+    python scripts/normalize_db.py /path/to/tailleader.sqlite [--dry-run] [--all]
 """
 
 import sqlite3
@@ -19,12 +21,93 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tailleader.aircraft_type_normalizer import normalize_aircraft_type
 
+# Registries repeat the same (manufacturer, aircraft_type, icao_type) triple
+# across whole fleets, so each distinct triple is normalized once. The
+# normalizer is registered as an SQLite function: distinct triples and their
+# normalized types are staged into a TEMP table by one INSERT ... SELECT, then
+# applied to aircraft_registry with one set-based UPDATE, all inside a single
+# transaction. No rows are shuttled through Python.
+NORM_TABLE_SQL = (
+    "CREATE TEMP TABLE norm (manufacturer TEXT, aircraft_type TEXT, icao_type TEXT, "
+    "normalized_type TEXT, records INTEGER)",
+    "CREATE INDEX temp.idx_norm_key ON norm(manufacturer, aircraft_type, icao_type)",
+)
+
+# IS rather than = so NULL columns match NULL columns
+NORM_MATCH = (
+    "norm.manufacturer IS aircraft_registry.manufacturer "
+    "AND norm.aircraft_type IS aircraft_registry.aircraft_type "
+    "AND norm.icao_type IS aircraft_registry.icao_type"
+)
+
+# Bulk-job tuning applied right after connecting. WAL + synchronous=NORMAL
+# avoid a full fsync per commit; the large page cache and mmap keep the
+# registry scan in memory.
+PRAGMAS = """
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-262144;
+PRAGMA mmap_size=268435456;
+"""
+
+# Dropping and rebuilding the normalized_type indexes only pays off when the
+# UPDATE touches at least this fraction of the registry
+BULK_REBUILD_FRACTION = 0.5
+
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "fuse.sshfs", "9p"}
+
+
+def on_network_filesystem(path):
+    """Best-effort check (Linux only) whether path lives on a network mount."""
+    path = os.path.realpath(path)
+    best_mount, best_type = "", None
+    try:
+        with open("/proc/mounts", "r") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point, fs_type = fields[1], fields[2]
+                under = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+                if under and len(mount_point) > len(best_mount):
+                    best_mount, best_type = mount_point, fs_type
+    except OSError:
+        return False
+    return best_type in NETWORK_FILESYSTEMS
+
+
+def drop_normalized_type_indexes(cur):
+    """Drop indexes on aircraft_registry that include normalized_type.
+    Returns their CREATE statements so they can be rebuilt afterwards. Used
+    only for bulk runs (--all, or most of the registry in scope), where
+    building an index once is much cheaper than maintaining it row by row.
+    Automatic (constraint) indexes have no SQL and are kept.
+    """
+    cur.execute(
+        "SELECT name, sql FROM sqlite_master "
+        "WHERE type = 'index' AND tbl_name = 'aircraft_registry' AND sql IS NOT NULL"
+    )
+    dropped = []
+    for name, sql in cur.fetchall():
+        cur.execute(f'PRAGMA index_info("{name}")')
+        if any(col[2] == "normalized_type" for col in cur.fetchall()):
+            cur.execute(f'DROP INDEX "{name}"')
+            dropped.append(sql)
+    return dropped
+
+
+def sql_normalize(manufacturer, aircraft_type, icao_type):
+    """normalize_aircraft_type for use inside SQLite; NULL for unknown types."""
+    normalized = normalize_aircraft_type(manufacturer, aircraft_type, icao_type)
+    return None if normalized == "Unknown" else normalized
+
 
 def main():
     parser = argparse.ArgumentParser(description="Normalize aircraft types in the database.")
     parser.add_argument("db_path", help="Path to the SQLite database file")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be changed without making changes")
     parser.add_argument("--limit", type=int, help="Limit number of records to process")
+    parser.add_argument("--all", action="store_true", help="Re-normalize every record, not just ones without a normalized type")
     args = parser.parse_args()
 
     if not os.path.exists(args.db_path):
@@ -35,6 +118,12 @@ def main():
     try:
         conn = sqlite3.connect(args.db_path)
         cur = conn.cursor()
+        if on_network_filesystem(args.db_path):
+            # WAL relies on shared memory and does not work over network filesystems
+            print("Warning: database is on a network filesystem; not enabling WAL.")
+        else:
+            cur.execute("PRAGMA journal_mode=WAL")
+        cur.executescript(PRAGMAS)
     except sqlite3.Error as e:
         print(f"Error connecting to database: {e}")
         sys.exit(1)
@@ -46,49 +135,94 @@ def main():
         print("Adding normalized_type column to aircraft_registry table...")
         cur.execute("ALTER TABLE aircraft_registry ADD COLUMN normalized_type TEXT")
         conn.commit()
-
-    print("Fetching aircraft registry...")
+    # Partial index so later runs can seek straight to the rows still missing a value
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_norm_null ON aircraft_registry(normalized_type) "
+        "WHERE normalized_type IS NULL"
+    )
+    conn.commit()
+
+    # Rows in scope: those still missing a value (or all with --all), capped by --limit.
+    # A limited scope is materialized first because updating normalized_type
+    # would otherwise change which rows the LIMIT picks.
+    scope = "1" if args.all else "normalized_type IS NULL"
+    if args.limit:
+        cur.execute(
+            f"CREATE TEMP TABLE scope AS SELECT hex FROM aircraft_registry WHERE {scope} LIMIT ?",
+            (args.limit,)
+        )
+        scope = "hex IN (SELECT hex FROM scope)"
+
+    unchanged_count = 0
+    conn.create_function("normalize_aircraft_type", 3, sql_normalize, deterministic=True)
+
+    print("Processing aircraft registry...")
     try:
-        query = "SELECT hex, manufacturer, aircraft_type, icao_type FROM aircraft_registry"
-        if args.limit:
-            query += f" LIMIT {args.limit}"
-        cur.execute(query)
-        rows = cur.fetchall()
+        conn.execute("BEGIN")
+        for statement in NORM_TABLE_SQL:
+            cur.execute(statement)
+        cur.execute(
+            "INSERT INTO norm "
+            "SELECT manufacturer, aircraft_type, icao_type, "
+            "normalize_aircraft_type(manufacturer, aircraft_type, icao_type), COUNT(*) "
+            f"FROM aircraft_registry WHERE {scope} "
+            "GROUP BY manufacturer, aircraft_type, icao_type"
+        )
+        cur.execute(
+            "SELECT COALESCE(SUM(CASE WHEN normalized_type IS NOT NULL THEN records END), 0), "
+            "COALESCE(SUM(CASE WHEN normalized_type IS NULL THEN records END), 0) FROM norm"
+        )
+        updated_count, skipped_count = cur.fetchone()
+        cur.execute("DELETE FROM norm WHERE normalized_type IS NULL")
     except sqlite3.Error as e:
-        print(f"Error reading registry: {e}")
+        print(f"Error normalizing registry: {e}")
+        conn.rollback()
         conn.close()
         sys.exit(1)
 
-    updated_count = 0
-    skipped_count = 0
-    print(f"Processing {len(rows)} records...")
-
-    for hex_code, manufacturer, aircraft_type, icao_type in rows:
-        # Compute normalized type
-        normalized = normalize_aircraft_type(manufacturer, aircraft_type, icao_type)
-        
-        if normalized == "Unknown":
-            skipped_count += 1
-            continue
-        
-        if args.dry_run:
+    if args.dry_run:
+        # Written in ~4 KB chunks instead of one print per type
+        out_buf = []
+        out_len = 0
+        cur.execute("SELECT manufacturer, aircraft_type, icao_type, normalized_type, records FROM norm")
+        for manufacturer, aircraft_type, icao_type, normalized, count in cur:
             old_display = f"{manufacturer or ''} {aircraft_type or ''}".strip() or icao_type or "None"
-            print(f"  {hex_code}: '{old_display}' -> '{normalized}'")
-            updated_count += 1
-        else:
-            try:
-                cur.execute(
-                    "UPDATE aircraft_registry SET normalized_type = ? WHERE hex = ?",
-                    (normalized, hex_code)
-                )
-                updated_count += 1
-            except sqlite3.Error as e:
-                print(f"Error updating hex {hex_code}: {e}")
-
-        if updated_count % 500 == 0 and not args.dry_run:
-            print(f"  Updated {updated_count} records...", end='\r')
-
-    if not args.dry_run:
+            line = f"  '{old_display}' -> '{normalized}' ({count} records)\n"
+            out_buf.append(line)
+            out_len += len(line)
+            if out_len >= 4096:
+                sys.stdout.write("".join(out_buf))
+                out_buf.clear()
+                out_len = 0
+        sys.stdout.write("".join(out_buf))
+        conn.rollback()
+    else:
+        print("Applying updates...")
+        try:
+            cur.execute("SELECT COUNT(*) FROM aircraft_registry")
+            registry_count = cur.fetchone()[0]
+            # Small incremental runs keep the indexes; the UPDATE can then
+            # use idx_norm_null to find its rows
+            bulk = args.all or updated_count >= BULK_REBUILD_FRACTION * registry_count
+            index_sql = drop_normalized_type_indexes(cur) if bulk else []
+            cur.execute(
+                "UPDATE aircraft_registry "
+                f"SET normalized_type = (SELECT normalized_type FROM norm WHERE {NORM_MATCH}) "
+                f"WHERE {scope} AND EXISTS (SELECT 1 FROM norm WHERE {NORM_MATCH}) "
+                # Leave rows that already hold the right value untouched
+                f"AND normalized_type IS NOT (SELECT normalized_type FROM norm WHERE {NORM_MATCH})"
+            )
+            unchanged_count = updated_count - cur.rowcount
+            updated_count = cur.rowcount
+            if index_sql:
+                print(f"Rebuilding {len(index_sql)} index(es) on normalized_type...")
+            for sql in index_sql:
+                cur.execute(sql)
+        except sqlite3.Error as e:
+            print(f"Error applying updates: {e}")
+            conn.rollback()
+            conn.close()
+            sys.exit(1)
         print("Committing changes...")
         conn.commit()
     
@@ -96,6 +230,8 @@ def main():
     
     action = "Would update" if args.dry_run else "Updated"
     print(f"\nDone! {action} {updated_count} records. Skipped {skipped_count} unknown types.")
+    if unchanged_count:
+        print(f"{unchanged_count} records already had the right normalized type.")
 
 
 if __name__ == "__main__":
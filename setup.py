@@ -0,0 +1,21 @@
+"""
+Optional build hook for compiling the aircraft type normalizer with mypyc.
+
+Package metadata lives in pyproject.toml; a normal install stays pure Python.
+Set TAILLEADER_MYPYC=1 (with mypy installed) to build the normalizer as a
+C extension instead:
+
+    TAILLEADER_MYPYC=1 pip install .
+"""
+
+import os
+
+from setuptools import setup
+
+ext_modules = []
+if os.environ.get("TAILLEADER_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(["tailleader/aircraft_type_normalizer.py"])
+
+setup(ext_modules=ext_modules)
@@ -1,21 +1,104 @@
 """Simple aircraft registration lookup using multiple sources."""
 import httpx
 import asyncio
+import random
 import re
+import string
+import sys
+import time
+from collections import OrderedDict
 from typing import Optional, Tuple
 
-# In-memory cache: hex -> (registration, aircraft_type, manufacturer, icao_type)
-_cache = {}
+# Upper bound on cached lookups; least recently used entries are evicted past it
+CACHE_MAX_ENTRIES = 200_000
+
+
+class _LRUCache(OrderedDict):
+    """OrderedDict that keeps at most `maxsize` entries, evicting the least recently used."""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+# How long a definitive "no registration" answer is trusted before re-querying
+MISS_TTL = 24 * 3600
+# Transient failures (timeouts, 5xx, 429) are retried this many times in total
+LOOKUP_ATTEMPTS = 2
+# After this many consecutive transient failures, stop querying for BREAKER_COOLDOWN seconds
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60
+# A hex whose lookup failed transiently (or was skipped by the breaker) isn't
+# retried in the background for this long; kept apart from MISS_TTL, which is
+# for definitive answers
+TRANSIENT_RETRY_AFTER = 60
+
+# In-memory cache: hex -> (registration, aircraft_type, manufacturer, icao_type),
+# or hex -> (None, expires_at) for a remembered miss
+_cache = _LRUCache(CACHE_MAX_ENTRIES)
+# Lookups currently in flight: hex -> Future resolving to the lookup result
+_pending = {}
+# hex -> time.monotonic() before which background lookups leave it alone
+_retry_after = _LRUCache(10_000)
+# Shared HTTP client so lookups reuse pooled keep-alive connections
+_client: Optional[httpx.AsyncClient] = None
+_consecutive_failures = 0
+_breaker_open_until = 0.0
+
+_PUNCT = re.compile(r'[^\w\s]')
+_WS = re.compile(r'\s+')
+# Text made only of these characters (with no double spaces) is already normalized
+_CLEAN_CHARS = frozenset(string.ascii_uppercase + string.digits + "_ ")
+# ASCII lookup table doing the same job as upper() + _PUNCT in one pass:
+# lowercase -> uppercase, anything that is neither \w nor whitespace -> space
+_ASCII_TABLE = str.maketrans({
+    c: (c.upper() if c.isalnum() or c == "_" or c.isspace() else " ")
+    for c in map(chr, range(128))
+})
 
 def normalize_text(text: Optional[str]) -> Optional[str]:
     """Normalize text by converting to uppercase, replacing punctuation with spaces, and stripping whitespace."""
     if not text:
         return None
+    # Most values (e.g. "B738", "BOEING") are already clean; skip the regex work
+    if "  " not in text and _CLEAN_CHARS.issuperset(text):
+        return text.strip()
+    if text.isascii():
+        # split() with no argument collapses and strips whitespace like _WS does
+        return ' '.join(text.translate(_ASCII_TABLE).split())
     text = text.upper()
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
+    text = _PUNCT.sub(' ', text)
+    text = _WS.sub(' ', text)
     return text.strip()
 
+def _intern(text: Optional[str]) -> Optional[str]:
+    return None if text is None else sys.intern(text)
+
+def _intern_entry(entry):
+    """Intern the type fields of a cache entry.
+    Manufacturer/type strings repeat across whole fleets ("BOEING", "B738"), so
+    interning collapses them to one object each. Registrations are unique per
+    aircraft and are left alone.
+    """
+    reg, aircraft_type, manufacturer, icao_type = entry
+    return (reg, _intern(aircraft_type), _intern(manufacturer), _intern(icao_type))
+
 async def lookup_registration(hex_code: str) -> Optional[Tuple[str, Optional[str], Optional[str], Optional[str]]]:
     """
     Look up aircraft registration and type by ICAO hex code.
@@ -25,14 +108,96 @@ async def lookup_registration(hex_code: str) -> Optional[Tuple[str, Optional[str
     hex_code = hex_code.upper()
     
     # Check cache first
-    if hex_code in _cache:
-        return _cache[hex_code]
-    
+    hit, entry = _cache_lookup(hex_code)
+    if hit:
+        return entry
+
+    # Another caller is already fetching this hex; share its result
+    pending = _pending.get(hex_code)
+    if pending is not None:
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            # Only propagate our own cancellation; a cancelled shared lookup
+            # counts as a miss, like any other failed fetch
+            if not pending.cancelled():
+                raise
+            return None
+
+    future = asyncio.get_running_loop().create_future()
+    _pending[hex_code] = future
     try:
-        # Try ADSBdb aircraft database
-        url = f"https://api.adsbdb.com/v0/aircraft/{hex_code.lower()}"
-        async with httpx.AsyncClient(timeout=3.0) as client:
-            r = await client.get(url)
+        result = await _fetch_registration(hex_code)
+        future.set_result(result)
+        return result
+    finally:
+        del _pending[hex_code]
+        # Cancelled or failed before a result: waiters see a miss, not our error
+        if not future.done():
+            future.set_result(None)
+
+async def lookup_many(hex_codes, concurrency: int = 16) -> list:
+    """Look up several hex codes concurrently, at most `concurrency` at a time.
+    Returns results in the same order as hex_codes.
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _one(hex_code):
+        async with sem:
+            return await lookup_registration(hex_code)
+
+    return await asyncio.gather(*(_one(h) for h in hex_codes))
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=3.0, limits=httpx.Limits(max_keepalive_connections=32))
+    return _client
+
+async def close():
+    """Close the shared HTTP client (call on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def _cache_lookup(hex_code: str):
+    """Return (hit, entry) for hex_code, treating expired misses as absent."""
+    entry = _cache.get(hex_code)
+    if entry is None:
+        return False, None
+    if isinstance(entry, tuple) and len(entry) == 2:
+        if entry[1] > time.time():
+            return True, None
+        del _cache[hex_code]
+        return False, None
+    return True, entry
+
+def _remember_miss(hex_code: str, expires_at: Optional[float] = None):
+    _cache[hex_code] = (None, expires_at if expires_at is not None else time.time() + MISS_TTL)
+
+async def _fetch_registration(hex_code: str) -> Optional[Tuple[str, Optional[str], Optional[str], Optional[str]]]:
+    """Query ADSBdb for hex_code and cache the outcome.
+    Only definitive answers are cached: a registration, or a 4xx / empty
+    response (remembered as a miss for MISS_TTL). Timeouts, connection
+    errors, 429 and 5xx are retried with jittered backoff and never cached,
+    so a flaky network can't poison the cache.
+    """
+    global _consecutive_failures, _breaker_open_until
+    if time.monotonic() < _breaker_open_until:
+        _defer_retry(hex_code)
+        return None
+
+    # Try ADSBdb aircraft database
+    url = f"https://api.adsbdb.com/v0/aircraft/{hex_code.lower()}"
+    for attempt in range(LOOKUP_ATTEMPTS):
+        if attempt:
+            await asyncio.sleep(0.5 * 2 ** attempt * (0.5 + random.random()))
+        try:
+            r = await _get_client().get(url)
+            if r.status_code == 429 or r.status_code >= 500:
+                r.raise_for_status()
+            _consecutive_failures = 0
             if r.status_code == 200:
                 data = r.json()
                 # API returns nested structure: response.aircraft
@@ -45,17 +210,42 @@ async def lookup_registration(hex_code: str) -> Optional[Tuple[str, Optional[str
                     manufacturer = normalize_text(aircraft.get('manufacturer'))
                     icao_type = normalize_text(aircraft.get('icao_type'))
                     
-                    result = (reg, aircraft_type, manufacturer, icao_type)
+                    result = _intern_entry((reg, aircraft_type, manufacturer, icao_type))
                     _cache[hex_code] = result
                     print(f"Looked up {hex_code} -> {reg} ({manufacturer} {aircraft_type})")
                     return result
-    except Exception as e:
-        print(f"Lookup error for {hex_code}: {e}")
-    
-    # If lookup fails, cache None to avoid repeated lookups
-    _cache[hex_code] = None
+            # Unknown hex (404) or no registration on record
+            _remember_miss(hex_code)
+            return None
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            print(f"Lookup error for {hex_code} (attempt {attempt + 1}): {e!r}")
+        except Exception as e:
+            # Malformed response; treat like a miss rather than retrying
+            print(f"Lookup error for {hex_code}: {e}")
+            _remember_miss(hex_code)
+            return None
+
+    _consecutive_failures += 1
+    if _consecutive_failures >= BREAKER_THRESHOLD:
+        print(f"ADSBdb lookups failing; pausing for {BREAKER_COOLDOWN}s")
+        _breaker_open_until = time.monotonic() + BREAKER_COOLDOWN
+        _consecutive_failures = 0
+    _defer_retry(hex_code)
     return None
 
+def _defer_retry(hex_code: str):
+    _retry_after[hex_code] = time.monotonic() + TRANSIENT_RETRY_AFTER
+
+def retry_deferred(hex_code: str) -> bool:
+    """Whether hex_code recently failed transiently and should not be retried yet."""
+    until = _retry_after.get(hex_code.upper())
+    if until is None:
+        return False
+    if until > time.monotonic():
+        return True
+    del _retry_after[hex_code.upper()]
+    return False
+
 def get_cached_registration(hex_code: str) -> Optional[str]:
     """Get registration from cache only (non-async). Returns just the registration string."""
     cached = _cache.get(hex_code.upper())
@@ -68,13 +258,27 @@ def get_cached_registration(hex_code: str) -> Optional[str]:
     else:
         return None
 
+def is_cached(hex_code: str) -> bool:
+    """Whether a lookup result (including an unexpired miss) is cached or in flight for hex_code."""
+    hex_code = hex_code.upper()
+    return _cache_lookup(hex_code)[0] or hex_code in _pending
+
 def get_cached_aircraft_data(hex_code: str) -> Optional[Tuple[str, Optional[str], Optional[str], Optional[str]]]:
     """Get full aircraft data from cache only (non-async)."""
-    return _cache.get(hex_code.upper())
+    return _cache_lookup(hex_code.upper())[1]
 
 def load_cache_from_db(registry: dict):
     """Preload cache from database registry.
     registry should be dict of hex -> (registration, aircraft_type, manufacturer, icao_type)
     """
     global _cache
-    _cache.update(registry)
+    # Make room for the whole registry plus the usual headroom for new lookups;
+    # evicting rows the database already holds would only send them back to
+    # the network
+    _cache.maxsize = max(_cache.maxsize, len(_cache) + len(registry) + CACHE_MAX_ENTRIES)
+    _cache.update({hex_code: _intern_entry(entry) for hex_code, entry in registry.items()})
+
+def load_misses_from_db(misses: dict):
+    """Preload remembered lookup misses: dict of hex -> checked_at (epoch seconds)."""
+    for hex_code, checked_at in misses.items():
+        _remember_miss(hex_code, checked_at + MISS_TTL)
@@ -6,7 +6,11 @@ Groups similar variants while preserving meaningful distinctions (e.g., NEO vs C
 """
 
 import re
-from typing import Optional, Tuple
+import sys
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple, cast
+
+_WS_RE = re.compile(r'\s+')
 
 # Manufacturer name normalization mapping
 MANUFACTURER_ALIASES = {
@@ -104,24 +108,92 @@ MANUFACTURER_ALIASES = {
     "NORTH AMERICAN": "North American",
 }
 
+# Interned so repeated lookups and cached results share one string object
+MANUFACTURER_ALIASES = {sys.intern(k): sys.intern(v) for k, v in MANUFACTURER_ALIASES.items()}
+
+# Canonical names already normalize to themselves
+_CANONICAL_MFRS = frozenset(MANUFACTURER_ALIASES.values())
+
 
+@lru_cache(maxsize=1024)
 def normalize_manufacturer(manufacturer: Optional[str]) -> Optional[str]:
     """Normalize manufacturer name to canonical form."""
     if not manufacturer:
         return None
+    if manufacturer in _CANONICAL_MFRS:
+        return manufacturer
     key = manufacturer.upper().strip()
     return MANUFACTURER_ALIASES.get(key, manufacturer.strip())
 
 
-# Aircraft model normalization patterns
-# Each tuple: (compiled_regex, canonical_name, manufacturer_override)
-# manufacturer_override is optional and used when the model implies the manufacturer
-AIRCRAFT_PATTERNS = []
+# Pieces of a pattern alternative that spell out a fixed set of strings
+_LITERAL_ALT_RE = re.compile(r"(?:[A-Z0-9/ ]|-\??|\\s[*?])+")
+_LITERAL_TOKEN_RE = re.compile(r"[A-Z0-9/ ]|-\??|\\s[*?]")
+_OPTIONAL_TOKENS = {"-?": ("", "-"), "\\s*": ("", " "), "\\s?": ("", " ")}
+
+
+def _split_alternatives(pattern: str) -> List[str]:
+    """Split a pattern on its top-level "|" (not inside groups or classes)."""
+    alternatives: List[str] = []
+    depth = 0
+    in_class = False
+    start = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            alternatives.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    alternatives.append(pattern[start:])
+    return alternatives
+
+
+def _strip_trailing_wildcard(pattern: str) -> str:
+    """Drop the trailing ".*" from each top-level alternative of a pattern.
+
+    Only whether a pattern matches matters, never how much it consumes, so
+    the tail just makes the engine run to the end of the string.
+    """
+    stripped = []
+    for alt in _split_alternatives(pattern):
+        # Leave an escaped "\\.*" alone
+        if alt.endswith(".*") and not alt.endswith("\\.*"):
+            alt = alt[:-2]
+        stripped.append(alt)
+    return "|".join(stripped)
+
+
+def _literal_variants(alternative: str) -> List[str]:
+    """Spell out the strings a literal-only alternative like "PC-?24" matches.
+
+    Returns an empty list if the alternative uses anything beyond plain
+    characters, "-?" and "\\s*"/"\\s?".
+    """
+    if not _LITERAL_ALT_RE.fullmatch(alternative):
+        return []
+    variants = [""]
+    for token in _LITERAL_TOKEN_RE.findall(alternative):
+        choices = _OPTIONAL_TOKENS.get(token, (token,))
+        variants = [v + c for v in variants for c in choices]
+        if len(variants) > 16:
+            return []
+    return variants
 
-def _init_patterns():
+
+def _init_patterns() -> List[Tuple[Pattern[str], str, str]]:
     """Initialize compiled regex patterns for aircraft normalization."""
-    global AIRCRAFT_PATTERNS
-    
     patterns = [
         # ============ AIRBUS NARROWBODY ============
         # A318
@@ -178,10 +250,10 @@ def _init_patterns():
         # ============ BOEING 737 ============
         # 737 NG (Next Generation) - catch all NG variants including "737Ng XXX/W" format
         # Pattern covers: 737-823, 737-8H4, 737Ng 823/W, 737Ng 8H4/W, etc.
-        (r"737-?[Nn]?[Gg]?\s*9[0-9A-Z]{2}.*|737.*NG.*9[0-9][0-9].*|737.*900.*", "737-900", "Boeing"),
-        (r"737-?[Nn]?[Gg]?\s*8[0-9A-Z]{2}.*|737.*NG.*8[0-9][0-9].*|737.*800.*", "737-800", "Boeing"),
-        (r"737-?[Nn]?[Gg]?\s*7[0-9A-Z]{2}.*|737.*NG.*7[0-9][0-9].*|737.*700.*", "737-700", "Boeing"),
-        (r"737-?[Nn]?[Gg]?\s*6[0-9A-Z]{2}.*|737.*NG.*6[0-9][0-9].*|737.*600.*", "737-600", "Boeing"),
+        (r"737-?N?G?\s*9[0-9A-Z]{2}.*|737.*NG.*9[0-9][0-9].*|737.*900.*", "737-900", "Boeing"),
+        (r"737-?N?G?\s*8[0-9A-Z]{2}.*|737.*NG.*8[0-9][0-9].*|737.*800.*", "737-800", "Boeing"),
+        (r"737-?N?G?\s*7[0-9A-Z]{2}.*|737.*NG.*7[0-9][0-9].*|737.*700.*", "737-700", "Boeing"),
+        (r"737-?N?G?\s*6[0-9A-Z]{2}.*|737.*NG.*6[0-9][0-9].*|737.*600.*", "737-600", "Boeing"),
         
         # 737 MAX variants - these have short codes (737-8, 737-9) or explicit MAX
         (r"737.*MAX\s*10.*|737-10(?:\s|$).*", "737 MAX 10", "Boeing"),
@@ -495,13 +567,67 @@ def _init_patterns():
         (r"AW189.*", "AW189", "Leonardo"),
     ]
     
-    AIRCRAFT_PATTERNS = [
+    return [
         (re.compile(pattern, re.IGNORECASE), canonical, mfr)
         for pattern, canonical, mfr in patterns
     ]
-    return AIRCRAFT_PATTERNS
 
 
+def _build_exact_types() -> Dict[str, int]:
+    """Map upper-cased exact type strings to a _META index.
+
+    Covers canonical names, their display forms, and every spelling of the
+    literal-only pattern alternatives ("R44", "PC-24", "PC24", ...).
+    """
+    keys: List[str] = []
+    for (pattern, _, _), (canonical, mfr) in zip(AIRCRAFT_PATTERNS, _META):
+        keys.append(canonical.upper())
+        keys.append(f"{mfr} {canonical}".upper())
+        for alternative in _split_alternatives(_strip_trailing_wildcard(pattern.pattern)):
+            keys.extend(v.strip() for v in _literal_variants(alternative))
+
+    # Seed the table from the regex itself so a hit here always agrees
+    # with what the full scan would have returned.
+    exact: Dict[str, int] = {}
+    for key in keys:
+        if key and key.isascii() and key not in exact:
+            m = _MASTER_PATTERN.match(key)
+            if m:
+                exact[key] = cast(int, m.lastindex) - 1
+    return exact
+
+
+# Aircraft model normalization patterns, built once at import
+# Each tuple: (compiled_regex, canonical_name, manufacturer_override)
+# manufacturer_override is optional and used when the model implies the manufacturer
+AIRCRAFT_PATTERNS: List[Tuple[Pattern[str], str, str]] = _init_patterns()
+
+# All patterns combined into one alternation, plus (canonical, mfr) per group.
+# Pattern i is capture group i + 1; the patterns themselves only use
+# non-capturing groups, so m.lastindex identifies which one matched.
+# Each alternative is tried at every offset before the next one, so match()
+# on the combined regex picks the same pattern a search() loop over
+# AIRCRAFT_PATTERNS would: the first one in list order that matches anywhere.
+# _MASTER_PATTERN is case-sensitive and expects upper-cased ASCII input.
+_MASTER_SOURCE = "|".join(
+    f"((?s:.*?)(?:{_strip_trailing_wildcard(pattern.pattern)}))"
+    for pattern, _, _ in AIRCRAFT_PATTERNS
+)
+_MASTER_PATTERN = re.compile(_MASTER_SOURCE)
+_MASTER_PATTERN_NOCASE = re.compile(_MASTER_SOURCE, re.IGNORECASE)
+assert _MASTER_PATTERN.groups == len(AIRCRAFT_PATTERNS), "aircraft patterns must not use capturing groups"
+# Bound once so lookups skip the attribute fetch
+_match_type = _MASTER_PATTERN.match
+_match_type_nocase = _MASTER_PATTERN_NOCASE.match
+_META: List[Tuple[str, str]] = [
+    (sys.intern(canonical), sys.intern(mfr)) for _, canonical, mfr in AIRCRAFT_PATTERNS
+]
+# Exact upper-cased type strings -> _META index, checked before the regex
+_EXACT_TYPES = _build_exact_types()
+
+
+# Fleets repeat the same inputs constantly, so results are memoized
+@lru_cache(maxsize=8192)
 def normalize_aircraft_type(manufacturer: Optional[str], aircraft_type: Optional[str], icao_type: Optional[str] = None) -> str:
     """
     Normalize an aircraft type to a canonical display name.
@@ -514,31 +640,37 @@ def normalize_aircraft_type(manufacturer: Optional[str], aircraft_type: Optional
     Returns:
         Normalized display string like "Boeing 737-800" or "Cessna 172 Skyhawk"
     """
-    global AIRCRAFT_PATTERNS
-    if not AIRCRAFT_PATTERNS:
-        AIRCRAFT_PATTERNS = _init_patterns()
-    
     # Start with normalized manufacturer
     norm_mfr = normalize_manufacturer(manufacturer)
     
     # Try to match the aircraft type against known patterns
     type_str = aircraft_type or icao_type or ""
     
-    for pattern, canonical, mfr_override in AIRCRAFT_PATTERNS:
-        if pattern.fullmatch(type_str) or pattern.search(type_str):
-            # Use pattern's manufacturer if specified, otherwise use normalized manufacturer
-            final_mfr = mfr_override or norm_mfr
-            if final_mfr:
-                return f"{final_mfr} {canonical}"
-            return canonical
+    index: Optional[int] = None
+    if type_str.isascii():
+        type_upper = type_str.upper()
+        index = _EXACT_TYPES.get(type_upper)
+        m = _match_type(type_upper) if index is None else None
+    else:
+        # str.upper() and re's case folding disagree on some non-ASCII letters
+        m = _match_type_nocase(type_str)
+    if m:
+        index = cast(int, m.lastindex) - 1
+    if index is not None:
+        canonical, mfr_override = _META[index]
+        # Use pattern's manufacturer if specified, otherwise use normalized manufacturer
+        final_mfr = mfr_override or norm_mfr
+        if final_mfr:
+            return f"{final_mfr} {canonical}"
+        return canonical
     
     # No pattern match - return cleaned up original
     if norm_mfr and type_str:
         # Clean up the type string
-        clean_type = re.sub(r'\s+', ' ', type_str).strip()
+        clean_type = _WS_RE.sub(' ', type_str).strip()
         return f"{norm_mfr} {clean_type}"
     elif type_str:
-        return re.sub(r'\s+', ' ', type_str).strip()
+        return _WS_RE.sub(' ', type_str).strip()
     elif icao_type:
         if norm_mfr:
             return f"{norm_mfr} {icao_type}"
@@ -547,6 +679,31 @@ def normalize_aircraft_type(manufacturer: Optional[str], aircraft_type: Optional
     return "Unknown"
 
 
+def normalize_many(rows: Iterable[Tuple[Optional[str], Optional[str], Optional[str]]]) -> List[str]:
+    """
+    Normalize a batch of (manufacturer, aircraft_type, icao_type) rows.
+    
+    Fleet snapshots repeat a small set of types many times over, so each
+    distinct row is normalized once and the result reused for its duplicates.
+    
+    Returns:
+        Normalized display strings in the same order as rows
+    """
+    seen: Dict[Tuple[Optional[str], Optional[str], Optional[str]], str] = {}
+    results: List[str] = []
+    for row in rows:
+        normalized = seen.get(row)
+        if normalized is None:
+            normalized = seen[row] = normalize_aircraft_type(*row)
+        results.append(normalized)
+    return results
+
+
+# Display strings normalize_type_display returns unchanged (filled in below)
+_CANONICAL_DISPLAYS: FrozenSet[str] = frozenset()
+
+
+@lru_cache(maxsize=8192)
 def normalize_type_display(type_display: str) -> str:
     """
     Normalize a pre-formatted type display string (e.g., "BOEING 737-800").
@@ -561,6 +718,9 @@ def normalize_type_display(type_display: str) -> str:
     """
     if not type_display or type_display == "Unknown":
         return "Unknown"
+    # Already-normalized output is common when results get re-fed
+    if type_display in _CANONICAL_DISPLAYS:
+        return type_display
     
     # Try to split into manufacturer and type
     parts = type_display.split(None, 1)
@@ -570,3 +730,11 @@ def normalize_type_display(type_display: str) -> str:
     else:
         # Single word - treat as type only
         return normalize_aircraft_type(None, type_display)
+
+
+# Only keep "Manufacturer Model" forms verified to map back to themselves
+_CANONICAL_DISPLAYS = frozenset(
+    display
+    for display in (f"{mfr} {canonical}" for canonical, mfr in _META)
+    if normalize_type_display(display) == display
+)
@@ -1,13 +1,22 @@
 import asyncio
+import csv
 import hmac
 import os
+import subprocess
+import time
+import psutil
 import yaml
 from fastapi import FastAPI, Query, Request, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from .db import ensure_db, top_registrations, recent_events, day_records
-from .poller import run_poller
+from .db import ensure_db, top_registrations, recent_events, day_records, read_conn, close_db
+from .db import store_registration, registry_count
+from .db import WINDOW_HEX_COUNTS_SQL, window_params, backfill_normalized_types, data_version
+from .db import NEEDS_NORMALIZED_TYPE_WHERE
+from .poller import run_poller, seen_aircraft
 from .poller import periodic_lookup_refresher
+from .aircraft_db import lookup_many
+from . import aircraft_db
 
 def load_config() -> dict:
     cfg_path = os.environ.get("TL_CONFIG", os.path.join(os.path.dirname(__file__), "config.yaml"))
@@ -67,119 +76,115 @@ SYSTEM_CONTROLS_KEY = _system_controls_key()
 @app.on_event("startup")
 async def startup():
     await ensure_db(db_path)
+    await backfill_normalized_types(db_path)
     # start poller
     asyncio.create_task(run_poller(config, db_path))
     # start periodic tail lookup refresher
     asyncio.create_task(periodic_lookup_refresher(db_path))
+    # keep feed service status fresh without forking per request
+    asyncio.create_task(_refresh_feed_status())
+    # sample system stats off the event loop; the first sample is taken here
+    # (it needs its own short CPU interval) so /api/stats is never empty
+    global _stats_snapshot
+    _stats_snapshot = await asyncio.to_thread(_sample_stats, 0.1)
+    asyncio.create_task(_stats_loop())
+
+@app.on_event("shutdown")
+async def shutdown():
+    await aircraft_db.close()
+    await close_db()
+
+def _json(content) -> Response:
+    """Encode plain rows/dicts straight to JSON, skipping FastAPI's
+    jsonable_encoder walk which dominates the cost on large lists."""
+    return JSONResponse(content)
+
+
+# Leaderboard results: key -> (computed_at, data_version, encoded body).
+# Entries are dropped as soon as anything is written, and windowed results
+# also expire after one poll interval since events age out of the window.
+_agg_cache = {}
+_AGG_CACHE_MAX_ENTRIES = 64
+_POLL_INTERVAL = int(config.get("feeder", {}).get("interval_seconds", 10))
+_ALL_TIME_TTL = 300
+
+
+async def _cached(key: tuple, window: str, compute):
+    now = time.time()
+    version = data_version()
+    ttl = _ALL_TIME_TTL if window == "all" else _POLL_INTERVAL
+    hit = _agg_cache.get(key)
+    if hit and hit[1] == version and now - hit[0] < ttl:
+        return Response(hit[2], media_type="application/json")
+    response = _json(await compute())
+    if len(_agg_cache) >= _AGG_CACHE_MAX_ENTRIES:
+        _agg_cache.clear()
+    # Stamp with the version seen before computing so a concurrent write
+    # invalidates this entry rather than being hidden by it
+    _agg_cache[key] = (now, version, response.body)
+    return response
+
 
 @app.get("/api/top")
 async def api_top(window: str = Query("24h", pattern="^(24h|30d|all)$"), limit: int = 20):
-    return await top_registrations(db_path, window, limit)
+    return await _cached(("top", window, limit), window, lambda: top_registrations(db_path, window, limit))
+
+_ALL_REGISTRATIONS_SQL = (
+    "SELECT ar.registration as tail, SUM(w.c) as c, MAX(ar.normalized_type) as ntype "
+    f"FROM ({WINDOW_HEX_COUNTS_SQL}) w "
+    "JOIN aircraft_registry ar ON w.hex = ar.hex "
+    "WHERE ar.registration IS NOT NULL "
+    "GROUP BY ar.registration ORDER BY c DESC"
+)
+
+# normalized_type is filled in by store_registration and the startup backfill
+_EVENT_TYPES_SQL = (
+    "SELECT ar.normalized_type, SUM(w.c) as c "
+    f"FROM ({WINDOW_HEX_COUNTS_SQL}) w "
+    "JOIN aircraft_registry ar ON w.hex = ar.hex "
+    "WHERE ar.normalized_type IS NOT NULL AND ar.normalized_type != '' "
+    "GROUP BY ar.normalized_type ORDER BY c DESC"
+)
+_REGISTRY_TYPES_SQL = (
+    "SELECT normalized_type, COUNT(*) as c "
+    "FROM aircraft_registry "
+    "WHERE normalized_type IS NOT NULL AND normalized_type != '' "
+    "GROUP BY normalized_type ORDER BY c DESC"
+)
 
 @app.get("/api/all_registrations")
 async def api_all_registrations(window: str = Query("all", pattern="^(24h|30d|all)$")):
     """Return all registrations for a given time window, ranked by frequency"""
-    import aiosqlite
-    async with aiosqlite.connect(db_path) as db:
-        if window == "24h":
-            import time
-            since = int(time.time()) - 24 * 3600
-            q = (
-                "SELECT ar.registration as tail, COUNT(*) as c, MAX(ar.normalized_type) as ntype "
-                "FROM events e "
-                "JOIN aircraft_registry ar ON e.hex = ar.hex "
-                "WHERE e.observed_at >= ? AND ar.registration IS NOT NULL "
-                "GROUP BY ar.registration ORDER BY c DESC"
-            )
-            async with db.execute(q, (since,)) as cur:
-                rows = await cur.fetchall()
-        elif window == "30d":
-            import time
-            since = int(time.time()) - 30 * 24 * 3600
-            q = (
-                "SELECT ar.registration as tail, COUNT(*) as c, MAX(ar.normalized_type) as ntype "
-                "FROM events e "
-                "JOIN aircraft_registry ar ON e.hex = ar.hex "
-                "WHERE e.observed_at >= ? AND ar.registration IS NOT NULL "
-                "GROUP BY ar.registration ORDER BY c DESC"
-            )
-            async with db.execute(q, (since,)) as cur:
-                rows = await cur.fetchall()
-        else:  # all
-            q = (
-                "SELECT ar.registration as tail, COUNT(*) as c, MAX(ar.normalized_type) as ntype "
-                "FROM events e "
-                "JOIN aircraft_registry ar ON e.hex = ar.hex "
-                "WHERE ar.registration IS NOT NULL "
-                "GROUP BY ar.registration ORDER BY c DESC"
-            )
-            async with db.execute(q) as cur:
-                rows = await cur.fetchall()
-
-        return [dict(rank=i+1, registration=tail, count=c, normalized_type=ntype) for i, (tail, c, ntype) in enumerate(rows)]
+    return await _cached(("all_registrations", window), window, lambda: _all_registrations(window))
+
+async def _all_registrations(window: str):
+    async with read_conn(db_path) as db:
+        async with db.execute(_ALL_REGISTRATIONS_SQL, window_params(window)) as cur:
+            rows = await cur.fetchall()
+
+    return [
+        {"rank": rank, "registration": tail, "count": c, "normalized_type": ntype}
+        for rank, (tail, c, ntype) in enumerate(rows, 1)
+    ]
 
 @app.get("/api/all_aircraft_types")
 async def api_all_aircraft_types(window: str = Query("all", pattern="^(24h|30d|all)$"), source: str = Query("events", pattern="^(events|registry)$")):
     """Return aircraft types ranked by frequency, with normalized type names"""
-    import aiosqlite
-    import time
-    from collections import defaultdict
-    from .aircraft_type_normalizer import normalize_aircraft_type
-    
-    async with aiosqlite.connect(db_path) as db:
-        # Fetch raw manufacturer, aircraft_type, icao_type for normalization
-        if source == "registry":
-            q = (
-                "SELECT manufacturer, aircraft_type, icao_type, COUNT(*) as c "
-                "FROM aircraft_registry "
-                "WHERE manufacturer IS NOT NULL OR aircraft_type IS NOT NULL OR icao_type IS NOT NULL "
-                "GROUP BY manufacturer, aircraft_type, icao_type"
-            )
-            async with db.execute(q) as cur:
-                rows = await cur.fetchall()
-        elif window == "24h":
-            since = int(time.time()) - 24 * 3600
-            q = (
-                "SELECT ar.manufacturer, ar.aircraft_type, ar.icao_type, COUNT(*) as c "
-                "FROM events e "
-                "JOIN aircraft_registry ar ON e.hex = ar.hex "
-                "WHERE e.observed_at >= ? AND (ar.manufacturer IS NOT NULL OR ar.aircraft_type IS NOT NULL OR ar.icao_type IS NOT NULL) "
-                "GROUP BY ar.manufacturer, ar.aircraft_type, ar.icao_type"
-            )
-            async with db.execute(q, (since,)) as cur:
-                rows = await cur.fetchall()
-        elif window == "30d":
-            since = int(time.time()) - 30 * 24 * 3600
-            q = (
-                "SELECT ar.manufacturer, ar.aircraft_type, ar.icao_type, COUNT(*) as c "
-                "FROM events e "
-                "JOIN aircraft_registry ar ON e.hex = ar.hex "
-                "WHERE e.observed_at >= ? AND (ar.manufacturer IS NOT NULL OR ar.aircraft_type IS NOT NULL OR ar.icao_type IS NOT NULL) "
-                "GROUP BY ar.manufacturer, ar.aircraft_type, ar.icao_type"
-            )
-            async with db.execute(q, (since,)) as cur:
-                rows = await cur.fetchall()
-        else:  # all
-            q = (
-                "SELECT ar.manufacturer, ar.aircraft_type, ar.icao_type, COUNT(*) as c "
-                "FROM events e "
-                "JOIN aircraft_registry ar ON e.hex = ar.hex "
-                "WHERE ar.manufacturer IS NOT NULL OR ar.aircraft_type IS NOT NULL OR ar.icao_type IS NOT NULL "
-                "GROUP BY ar.manufacturer, ar.aircraft_type, ar.icao_type"
-            )
-            async with db.execute(q) as cur:
-                rows = await cur.fetchall()
-        
-        # Normalize and aggregate counts by normalized type
-        type_counts = defaultdict(int)
-        for manufacturer, aircraft_type, icao_type, count in rows:
-            normalized = normalize_aircraft_type(manufacturer, aircraft_type, icao_type)
-            if normalized and normalized != "Unknown":
-                type_counts[normalized] += count
-        
-        # Sort by count descending and assign ranks
-        sorted_types = sorted(type_counts.items(), key=lambda x: x[1], reverse=True)
-        return [dict(rank=i+1, aircraft_type=type_name, count=count) for i, (type_name, count) in enumerate(sorted_types)]
+    return await _cached(("all_aircraft_types", window, source), window, lambda: _all_aircraft_types(window, source))
+
+async def _all_aircraft_types(window: str, source: str):
+    if source == "registry":
+        q, params = _REGISTRY_TYPES_SQL, ()
+    else:
+        q, params = _EVENT_TYPES_SQL, window_params(window)
+    async with read_conn(db_path) as db:
+        async with db.execute(q, params) as cur:
+            rows = await cur.fetchall()
+
+    return [
+        {"rank": rank, "aircraft_type": type_name, "count": count}
+        for rank, (type_name, count) in enumerate(rows, 1)
+    ]
 
 
 @app.post("/api/backfill_types")
@@ -187,12 +192,9 @@ async def api_backfill_types(limit: int = 500):
     """Backfill aircraft type/manufacturer/icao_type for cached registrations.
     Processes up to `limit` entries missing type info.
     """
-    import aiosqlite
-    from .aircraft_db import lookup_registration
-    from .db import store_registration
     processed = 0
     remaining = 0
-    async with aiosqlite.connect(db_path) as db:
+    async with read_conn(db_path) as db:
         # Count remaining missing type entries
         async with db.execute(
             "SELECT COUNT(*) FROM aircraft_registry WHERE (aircraft_type IS NULL OR aircraft_type = '') AND (manufacturer IS NULL OR manufacturer = '') AND (icao_type IS NULL OR icao_type = '')"
@@ -206,15 +208,18 @@ async def api_backfill_types(limit: int = 500):
             (limit,)
         ) as cur:
             rows = await cur.fetchall()
-            for (hex_code,) in rows:
-                try:
-                    result = await lookup_registration(hex_code)
-                    if result:
-                        reg, aircraft_type, manufacturer, icao_type = result
-                        await store_registration(db_path, hex_code, reg or '', aircraft_type, manufacturer, icao_type)
-                        processed += 1
-                except Exception:
-                    pass
+            hex_codes = [hex_code for (hex_code,) in rows]
+
+    # Network lookups and writes happen after the read connection is returned
+    results = await lookup_many(hex_codes)
+    for hex_code, result in zip(hex_codes, results):
+        try:
+            if result:
+                reg, aircraft_type, manufacturer, icao_type = result
+                await store_registration(db_path, hex_code, reg or '', aircraft_type, manufacturer, icao_type)
+                processed += 1
+        except Exception:
+            pass
 
     return {"status": "ok", "processed": processed, "remaining": max(0, remaining - processed)}
 
@@ -223,9 +228,6 @@ async def api_backfill_types_local(limit: int = 10000):
     """Backfill aircraft type/manufacturer/icao_type using local CSV database.
     Scans the local aircraft-db.csv (misnamed .zip) and updates missing entries.
     """
-    import aiosqlite
-    import csv
-    import os
     processed = 0
     data_file = os.path.join(data_dir, "aircraft-db.csv.zip")
     if not os.path.exists(data_file):
@@ -233,7 +235,7 @@ async def api_backfill_types_local(limit: int = 10000):
 
     # Collect missing hexes
     missing = set()
-    async with aiosqlite.connect(db_path) as db:
+    async with read_conn(db_path) as db:
         async with db.execute(
             "SELECT hex FROM aircraft_registry WHERE (aircraft_type IS NULL OR aircraft_type = '') AND (manufacturer IS NULL OR manufacturer = '') AND (icao_type IS NULL OR icao_type = '')"
         ) as cur:
@@ -258,7 +260,6 @@ async def api_backfill_types_local(limit: int = 10000):
                     icao_type = (row.get("icaoaircrafttype") or "").strip()
                     # Only update if we have at least one type field
                     if manufacturer or aircraft_type or icao_type:
-                        from .db import store_registration
                         await store_registration(db_path, icao24, reg or "", aircraft_type or None, manufacturer or None, icao_type or None)
                         processed += 1
                         # remove from missing to avoid re-processing
@@ -275,132 +276,32 @@ async def api_backfill_normalized(limit: int = 10000):
     """Backfill normalized_type column for existing aircraft registry entries.
     Processes up to `limit` entries missing normalized type.
     """
-    import aiosqlite
-    from .aircraft_type_normalizer import normalize_aircraft_type
-    
-    processed = 0
-    remaining = 0
-    
-    async with aiosqlite.connect(db_path) as db:
-        # Count entries needing normalized type
-        async with db.execute(
-            "SELECT COUNT(*) FROM aircraft_registry WHERE normalized_type IS NULL AND (manufacturer IS NOT NULL OR aircraft_type IS NOT NULL OR icao_type IS NOT NULL)"
-        ) as cur:
-            row = await cur.fetchone()
-            remaining = int(row[0] or 0)
-        
-        if remaining == 0:
-            return {"status": "ok", "processed": 0, "remaining": 0}
-        
-        # Fetch batch to process
-        async with db.execute(
-            "SELECT hex, manufacturer, aircraft_type, icao_type FROM aircraft_registry WHERE normalized_type IS NULL AND (manufacturer IS NOT NULL OR aircraft_type IS NOT NULL OR icao_type IS NOT NULL) LIMIT ?",
-            (limit,)
-        ) as cur:
-            rows = await cur.fetchall()
-        
-        # Update each row
-        for hex_code, manufacturer, aircraft_type, icao_type in rows:
-            normalized = normalize_aircraft_type(manufacturer, aircraft_type, icao_type)
-            if normalized and normalized != "Unknown":
-                await db.execute(
-                    "UPDATE aircraft_registry SET normalized_type = ? WHERE hex = ?",
-                    (normalized, hex_code)
-                )
-                processed += 1
-        
-        await db.commit()
-    
-    return {"status": "ok", "processed": processed, "remaining": max(0, remaining - processed)}
-
-@app.get("/api/all_aircraft_types")
-async def api_all_aircraft_types(window: str = Query("all", pattern="^(24h|30d|all)$")):
-    """Return all aircraft types for a given time window, ranked by frequency"""
-    import aiosqlite
-    import time
-    
-    async with aiosqlite.connect(db_path) as db:
-        if window == "24h":
-            since = int(time.time()) - 24 * 3600
-            q = (
-                "SELECT "
-                "CASE "
-                "  WHEN ar.manufacturer IS NOT NULL AND ar.aircraft_type IS NOT NULL "
-                "    THEN ar.manufacturer || ' ' || ar.aircraft_type "
-                "  WHEN ar.icao_type IS NOT NULL "
-                "    THEN ar.icao_type "
-                "  ELSE 'Unknown' "
-                "END as type_display, "
-                "COUNT(*) as c "
-                "FROM events e "
-                "JOIN aircraft_registry ar ON e.hex = ar.hex "
-                "WHERE e.observed_at >= ? "
-                "GROUP BY type_display "
-                "HAVING type_display != 'Unknown' "
-                "ORDER BY c DESC"
-            )
-            async with db.execute(q, (since,)) as cur:
-                rows = await cur.fetchall()
-        elif window == "30d":
-            since = int(time.time()) - 30 * 24 * 3600
-            q = (
-                "SELECT "
-                "CASE "
-                "  WHEN ar.manufacturer IS NOT NULL AND ar.aircraft_type IS NOT NULL "
-                "    THEN ar.manufacturer || ' ' || ar.aircraft_type "
-                "  WHEN ar.icao_type IS NOT NULL "
-                "    THEN ar.icao_type "
-                "  ELSE 'Unknown' "
-                "END as type_display, "
-                "COUNT(*) as c "
-                "FROM events e "
-                "JOIN aircraft_registry ar ON e.hex = ar.hex "
-                "WHERE e.observed_at >= ? "
-                "GROUP BY type_display "
-                "HAVING type_display != 'Unknown' "
-                "ORDER BY c DESC"
-            )
-            async with db.execute(q, (since,)) as cur:
-                rows = await cur.fetchall()
-        else:  # all
-            q = (
-                "SELECT "
-                "CASE "
-                "  WHEN ar.manufacturer IS NOT NULL AND ar.aircraft_type IS NOT NULL "
-                "    THEN ar.manufacturer || ' ' || ar.aircraft_type "
-                "  WHEN ar.icao_type IS NOT NULL "
-                "    THEN ar.icao_type "
-                "  ELSE 'Unknown' "
-                "END as type_display, "
-                "COUNT(*) as c "
-                "FROM events e "
-                "JOIN aircraft_registry ar ON e.hex = ar.hex "
-                "GROUP BY type_display "
-                "HAVING type_display != 'Unknown' "
-                "ORDER BY c DESC"
-            )
-            async with db.execute(q) as cur:
-                rows = await cur.fetchall()
-        
-        return [dict(rank=i+1, aircraft_type=type_display, count=c) for i, (type_display, c) in enumerate(rows)]
+    processed = await backfill_normalized_types(db_path, limit)
+    # Rows whose type normalizes to "Unknown" stay NULL and are still counted
+    async with read_conn(db_path) as db:
+        async with db.execute(f"SELECT COUNT(*) FROM aircraft_registry WHERE {NEEDS_NORMALIZED_TYPE_WHERE}") as cur:
+            remaining = (await cur.fetchone())[0]
+    return {"status": "ok", "processed": processed, "remaining": remaining}
 
 @app.get("/api/recent")
 async def api_recent(limit: int = 50):
-    return await recent_events(db_path, limit)
+    return _json(await recent_events(db_path, limit))
 
 @app.get("/api/day_records")
 async def api_day_records(limit: int = Query(10, ge=1, le=100)):
     """All-time daily leaderboards: days with the most planes and most aircraft types."""
-    return await day_records(db_path, limit)
+    return _json(await day_records(db_path, limit))
+
+# Serialized /api/live body and the seen_aircraft version it was built from;
+# the poller only changes the set once per interval, so most requests reuse it
+_live_cache = {"version": None, "body": b"[]"}
 
 @app.get("/api/live")
 async def api_live():
     """Return currently visible aircraft from the poller cache"""
-    from .poller import seen_aircraft
-    live = []
-    for hex_id, (reg, rssi, lat, lon, track, last_seen) in seen_aircraft.items():
-        if lat and lon:  # Only include aircraft with valid positions
-            live.append({
+    if _live_cache["version"] != seen_aircraft.version:
+        live = [
+            {
                 "hex": hex_id,
                 "registration": reg,
                 "lat": lat,
@@ -408,18 +309,28 @@ async def api_live():
                 "track": track,
                 "rssi": rssi,
                 "last_seen": last_seen
-            })
-    return live
+            }
+            for hex_id, (reg, rssi, lat, lon, track, last_seen) in seen_aircraft.items()
+            if lat and lon  # Only include aircraft with valid positions
+        ]
+        _live_cache.update(version=seen_aircraft.version, body=_json(live).body)
+    return Response(_live_cache["body"], media_type="application/json")
 
-@app.get("/api/stats")
-async def api_stats():
-    """Return system stats (CPU, RAM, temp)"""
-    import psutil
+_STATS_INTERVAL = 2
+
+# Latest system stats, refreshed by _stats_loop
+_stats_snapshot = {}
+
+
+def _sample_stats(cpu_interval=None) -> dict:
+    """Read CPU, RAM and temperature. With cpu_interval=None the CPU figure
+    covers the time since the previous call."""
+    mem = psutil.virtual_memory()
     stats = {
-        "cpu_percent": round(psutil.cpu_percent(interval=0.1), 1),
-        "memory_percent": round(psutil.virtual_memory().percent, 1),
-        "memory_used_mb": round(psutil.virtual_memory().used / 1024 / 1024, 0),
-        "memory_total_mb": round(psutil.virtual_memory().total / 1024 / 1024, 0),
+        "cpu_percent": round(psutil.cpu_percent(interval=cpu_interval), 1),
+        "memory_percent": round(mem.percent, 1),
+        "memory_used_mb": round(mem.used / 1024 / 1024, 0),
+        "memory_total_mb": round(mem.total / 1024 / 1024, 0),
     }
     
     # Try to get CPU temperature (Raspberry Pi specific)
@@ -432,46 +343,81 @@ async def api_stats():
     
     return stats
 
+
+async def _stats_loop():
+    global _stats_snapshot
+    # startup() took the first sample; each later one averages CPU over the
+    # gap since the previous sample
+    while True:
+        await asyncio.sleep(_STATS_INTERVAL)
+        try:
+            _stats_snapshot = await asyncio.to_thread(_sample_stats)
+        except Exception:
+            pass
+
+
+@app.get("/api/stats")
+async def api_stats():
+    """Return system stats (CPU, RAM, temp) from the last background sample"""
+    return dict(_stats_snapshot)
+
 @app.get("/api/lookup_stats")
 async def api_lookup_stats():
     """Return tail lookup stats: known tails in registry and pending seen aircraft without tails."""
-    import aiosqlite
-    from .poller import seen_aircraft
-    known = 0
-    async with aiosqlite.connect(db_path) as db:
-        async with db.execute("SELECT COUNT(*) FROM aircraft_registry") as cur:
-            row = await cur.fetchone()
-            known = row[0] or 0
-    pending = sum(1 for _, (reg, *_rest) in seen_aircraft.items() if not reg)
+    known = await registry_count(db_path)
+    pending = len(seen_aircraft.pending)
     return {"known": known, "pending": pending}
 
+FEED_SERVICES = {
+    "fr24": "fr24feed.service",
+    "piaware": "piaware.service",
+    "adsbexchange": "adsbexchange-feed.service",
+}
+_FEED_STATUS_INTERVAL = 10
+
+# Last known state of each feed service, refreshed by _refresh_feed_status
+_feed_status = {name: {"online": False} for name in FEED_SERVICES}
+
+
+async def _check_feed_services() -> dict:
+    """Ask systemd for every feed's ActiveState in a single call"""
+    status = {name: {"online": False} for name in FEED_SERVICES}
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "systemctl", "show", "-p", "ActiveState", *FEED_SERVICES.values(),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError:
+        return status
+    try:
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=2)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return status
+    # One "ActiveState=..." line per unit, in the order they were requested
+    states = [line.split("=", 1)[1] for line in stdout.decode().splitlines()
+              if line.startswith("ActiveState=")]
+    for name, state in zip(FEED_SERVICES, states):
+        status[name] = {"online": state == "active"}
+    return status
+
+
+async def _refresh_feed_status():
+    global _feed_status
+    while True:
+        try:
+            _feed_status = await _check_feed_services()
+        except Exception:
+            pass
+        await asyncio.sleep(_FEED_STATUS_INTERVAL)
+
+
 @app.get("/api/feed_status")
 async def api_feed_status():
-    """Check status of connected feed services"""
-    import subprocess
-    import json
-    
-    services = {
-        "fr24": "fr24feed.service",
-        "piaware": "piaware.service",
-        "adsbexchange": "adsbexchange-feed.service",
-    }
-    
-    status = {}
-    for name, service in services.items():
-        try:
-            result = subprocess.run(
-                ["systemctl", "is-active", service],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            is_active = result.stdout.strip() == "active"
-            status[name] = {"online": is_active}
-        except Exception as e:
-            status[name] = {"online": False}
-    
-    return status
+    """Status of connected feed services, as of the last background check"""
+    return _feed_status
 
 
 @app.get("/api/station")
@@ -511,7 +457,6 @@ async def api_system_controls():
 @app.post("/api/restart_service")
 async def restart_service(request: Request):
     """Restart the tailleader systemd service"""
-    import subprocess
     _require_system_controls_access(request)
     try:
         subprocess.run(["sudo", "systemctl", "restart", "tailleader.service"], check=True)
@@ -522,7 +467,6 @@ async def restart_service(request: Request):
 @app.post("/api/restart_pi")
 async def restart_pi(request: Request):
     """Restart the Raspberry Pi"""
-    import subprocess
     _require_system_controls_access(request)
     try:
         subprocess.run(["sudo", "shutdown", "-r", "now"], check=True)
@@ -1,7 +1,12 @@
+import asyncio
 import os
 import time
 import aiosqlite
-from typing import Optional
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, Optional
+from .aircraft_type_normalizer import normalize_aircraft_type, normalize_many
+from .aircraft_db import MISS_TTL
 
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS events (
@@ -14,9 +19,11 @@ CREATE TABLE IF NOT EXISTS events (
   lon REAL
 );
 
-CREATE INDEX IF NOT EXISTS idx_events_observed_at ON events(observed_at);
+-- Composite indexes cover both the time-window filter and the hex join, so
+-- leaderboard queries read hex straight from the index instead of the table
+CREATE INDEX IF NOT EXISTS idx_events_time_hex ON events(observed_at, hex);
+CREATE INDEX IF NOT EXISTS idx_events_hex_time ON events(hex, observed_at);
 CREATE INDEX IF NOT EXISTS idx_events_registration ON events(registration);
-CREATE INDEX IF NOT EXISTS idx_events_hex ON events(hex);
 
 -- Virtual table for hex -> registration lookups
 CREATE TABLE IF NOT EXISTS aircraft_registry (
@@ -28,75 +35,255 @@ CREATE TABLE IF NOT EXISTS aircraft_registry (
   normalized_type TEXT,  -- cached normalized display name
   last_updated INTEGER
 );
+
+CREATE INDEX IF NOT EXISTS idx_registry_normtype ON aircraft_registry(normalized_type);
+
+-- Hexes that ADSBdb had no registration for, so restarts don't re-query them
+CREATE TABLE IF NOT EXISTS lookup_misses (
+  hex TEXT PRIMARY KEY,
+  checked_at INTEGER NOT NULL
+);
+
+-- Events per UTC day and hex, kept up to date by insert_events so
+-- leaderboards can sum days instead of scanning every event
+CREATE TABLE IF NOT EXISTS daily_summary (
+  date TEXT NOT NULL, -- YYYY-MM-DD UTC
+  hex TEXT NOT NULL,
+  count_total INTEGER NOT NULL,
+  PRIMARY KEY (date, hex)
+) WITHOUT ROWID;
+
+-- Events per hex over all time, kept alongside daily_summary so the all-time
+-- leaderboards read one row per aircraft instead of one per aircraft per day
+CREATE TABLE IF NOT EXISTS hex_totals (
+  hex TEXT PRIMARY KEY,
+  count_total INTEGER NOT NULL
+) WITHOUT ROWID;
 """
 
+_SUMMARY_UPSERT_SQL = (
+    "INSERT INTO daily_summary (date, hex, count_total) VALUES (date(?, 'unixepoch'), ?, 1) "
+    "ON CONFLICT(date, hex) DO UPDATE SET count_total = count_total + 1"
+)
+_TOTALS_UPSERT_SQL = (
+    "INSERT INTO hex_totals (hex, count_total) VALUES (?, 1) "
+    "ON CONFLICT(hex) DO UPDATE SET count_total = count_total + 1"
+)
+
+# Applied to every connection we open. Connections are long-lived, so the
+# page cache survives between queries instead of being rebuilt per request.
+PRAGMAS = """
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+PRAGMA busy_timeout=5000;
+PRAGMA mmap_size=134217728;
+"""
+
+# Read-only connections per database, so dashboard reads don't queue behind writes
+READ_POOL_SIZE = min(4, os.cpu_count() or 1)
+
+# One shared writer connection per database path, plus a lock so each
+# write-and-commit runs as a unit on it
+_write_conns: Dict[str, aiosqlite.Connection] = {}
+_write_locks: Dict[str, asyncio.Lock] = {}
+_read_pools: Dict[str, asyncio.Queue] = {}
+_open_locks: Dict[str, asyncio.Lock] = {}
+# Rows in aircraft_registry, counted once per database and then kept current
+# by store_registration (the only place rows are added)
+_registry_counts: Dict[str, int] = {}
+
+
+def _lock(locks: Dict[str, asyncio.Lock], db_path: str) -> asyncio.Lock:
+    # Created lazily so the lock belongs to the running event loop
+    lock = locks.get(db_path)
+    if lock is None:
+        lock = locks[db_path] = asyncio.Lock()
+    return lock
+
+
+async def _open(db_path: str, read_only: bool = False) -> aiosqlite.Connection:
+    if read_only:
+        conn = await aiosqlite.connect(Path(db_path).absolute().as_uri() + "?mode=ro", uri=True)
+    else:
+        conn = await aiosqlite.connect(db_path)
+    await conn.executescript(PRAGMAS)
+    return conn
+
+
+async def get_conn(db_path: str) -> aiosqlite.Connection:
+    """Return the shared writer connection for db_path, opening it on first use."""
+    conn = _write_conns.get(db_path)
+    if conn is None:
+        async with _lock(_open_locks, db_path):
+            conn = _write_conns.get(db_path)
+            if conn is None:
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+                conn = await _open(db_path)
+                # WAL lets the continuous poller writes and the dashboard reads proceed
+                # without blocking each other (default rollback journal serializes them).
+                await conn.execute("PRAGMA journal_mode=WAL")
+                _write_conns[db_path] = conn
+    return conn
+
+
+# Bumped after every committed write, so callers can tell cached reads are stale
+_data_version = 0
+
+
+@asynccontextmanager
+async def write_conn(db_path: str):
+    """Hold the writer connection for a unit of work; commits on success."""
+    conn = await get_conn(db_path)
+    async with _lock(_write_locks, db_path):
+        try:
+            yield conn
+            # Inside the guard: a failed COMMIT must not leave the shared
+            # connection stuck in an open transaction
+            await conn.commit()
+        except BaseException:
+            await conn.rollback()
+            raise
+        global _data_version
+        _data_version += 1
+
+
+def data_version() -> int:
+    """Counter that changes whenever write_conn commits."""
+    return _data_version
+
+
+@asynccontextmanager
+async def read_conn(db_path: str):
+    """Borrow a read-only connection from the pool for db_path."""
+    pool = _read_pools.get(db_path)
+    if pool is None:
+        # The writer creates the file and switches it to WAL before any reader opens
+        await get_conn(db_path)
+        async with _lock(_open_locks, db_path):
+            pool = _read_pools.get(db_path)
+            if pool is None:
+                pool = asyncio.Queue()
+                for _ in range(READ_POOL_SIZE):
+                    pool.put_nowait(await _open(db_path, read_only=True))
+                _read_pools[db_path] = pool
+    conn = await pool.get()
+    try:
+        yield conn
+    finally:
+        pool.put_nowait(conn)
+
+
+async def close_db():
+    """Close every pooled connection (called on shutdown)."""
+    for pool in _read_pools.values():
+        while not pool.empty():
+            await pool.get_nowait().close()
+    for conn in _write_conns.values():
+        await conn.close()
+    _read_pools.clear()
+    _write_conns.clear()
+    _write_locks.clear()
+    _open_locks.clear()
+    _registry_counts.clear()
+
+
 async def ensure_db(db_path: str):
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    async with aiosqlite.connect(db_path) as db:
-        # WAL lets the continuous poller writes and the dashboard reads proceed
-        # without blocking each other (default rollback journal serializes them).
-        await db.execute("PRAGMA journal_mode=WAL")
+    async with write_conn(db_path) as db:
+        # An old rollup_daily table keyed by registration may still be around;
+        # replace it with the per-hex summary and rebuild that from events.
+        async with db.execute("PRAGMA table_info(daily_summary)") as cur:
+            summary_columns = {row[1] for row in await cur.fetchall()}
+        if summary_columns and "hex" not in summary_columns:
+            await db.execute("DROP TABLE daily_summary")
+        async with db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hex_totals'") as cur:
+            have_totals = await cur.fetchone() is not None
         await db.executescript(SCHEMA)
-        # daily_summary was written by rollup_daily but never read; drop the
-        # leftover table so existing installs reclaim the space.
-        await db.execute("DROP TABLE IF EXISTS daily_summary")
-        await db.commit()
-
-async def insert_event(db_path: str, event: dict):
-    async with aiosqlite.connect(db_path) as db:
+        if "hex" not in summary_columns:
+            await db.execute(
+                "INSERT INTO daily_summary (date, hex, count_total) "
+                "SELECT date(observed_at, 'unixepoch'), hex, COUNT(*) FROM events GROUP BY 1, 2"
+            )
+        if not have_totals or "hex" not in summary_columns:
+            await db.execute("DELETE FROM hex_totals")
+            await db.execute(
+                "INSERT INTO hex_totals (hex, count_total) "
+                "SELECT hex, SUM(count_total) FROM daily_summary GROUP BY hex"
+            )
+        # Single-column indexes superseded by the composite ones above
+        await db.execute("DROP INDEX IF EXISTS idx_events_observed_at")
+        await db.execute("DROP INDEX IF EXISTS idx_events_hex")
+        # Expired misses would be ignored on load anyway, and a hex that has
+        # since been found no longer needs its miss
         await db.execute(
+            "DELETE FROM lookup_misses WHERE checked_at <= ? OR hex IN (SELECT hex FROM aircraft_registry)",
+            (int(time.time()) - MISS_TTL,)
+        )
+        # Refresh planner statistics; analysis_limit keeps this quick on large tables
+        await db.execute("PRAGMA analysis_limit=1000")
+        await db.execute("ANALYZE")
+        async with db.execute("SELECT COUNT(*) FROM aircraft_registry") as cur:
+            _registry_counts[db_path] = (await cur.fetchone())[0]
+
+async def insert_events(db_path: str, events: list):
+    """Insert a poll cycle's arrivals in one transaction.
+
+    Each event is an (observed_at, hex, registration, rssi, lat, lon) tuple.
+    """
+    if not events:
+        return
+    async with write_conn(db_path) as db:
+        await db.execute("BEGIN IMMEDIATE")
+        await db.executemany(
             "INSERT INTO events (observed_at, hex, registration, rssi, lat, lon) VALUES (?,?,?,?,?,?)",
-            (
-                event.get("observed_at"),
-                event.get("hex"),
-                event.get("registration"),
-                event.get("rssi"),
-                event.get("lat"),
-                event.get("lon"),
-            ),
+            events,
         )
-        await db.commit()
+        await db.executemany(_SUMMARY_UPSERT_SQL, [(e[0], e[1]) for e in events])
+        await db.executemany(_TOTALS_UPSERT_SQL, [(e[1],) for e in events])
+
+# Leaderboard windows in seconds; "all" counts from the epoch
+WINDOW_SECONDS = {"24h": 24 * 3600, "30d": 30 * 24 * 3600}
+
+# (hex, c) event counts for a window, bound with window_params() as ?1 = since
+# and ?2 = the first whole UTC day. "all" (since = 0) reads hex_totals. Other
+# windows sum whole days from daily_summary and count only the partial first
+# day from events, so the totals match a direct scan of events. The branch
+# conditions are constant per query, so SQLite skips the unused branches.
+# Every window shares this text, so each query built on it is prepared once
+# per connection. The partial day is at most 24h of events; without INDEXED BY
+# the planner skip-scans idx_events_hex_time across every hex instead.
+WINDOW_HEX_COUNTS_SQL = (
+    "SELECT hex, count_total AS c FROM hex_totals WHERE ?1 = 0 "
+    "UNION ALL "
+    "SELECT hex, count_total AS c FROM daily_summary WHERE ?1 > 0 AND date >= date(?2, 'unixepoch') "
+    "UNION ALL "
+    "SELECT hex, COUNT(*) AS c FROM events INDEXED BY idx_events_time_hex "
+    "WHERE observed_at >= ?1 AND observed_at < ?2 GROUP BY hex"
+)
+
+
+def window_params(window: str) -> tuple:
+    """Parameters for WINDOW_HEX_COUNTS_SQL covering the given window."""
+    seconds = WINDOW_SECONDS.get(window)
+    since = int(time.time()) - seconds if seconds else 0
+    next_day = since - since % 86400 + 86400
+    return (since, next_day)
+
+
+_TOP_REGISTRATIONS_SQL = (
+    "SELECT ar.registration as tail, SUM(w.c) as c "
+    f"FROM ({WINDOW_HEX_COUNTS_SQL}) w "
+    "JOIN aircraft_registry ar ON w.hex = ar.hex "
+    "WHERE ar.registration IS NOT NULL "
+    "GROUP BY ar.registration ORDER BY c DESC LIMIT ?"
+)
+
 
 async def top_registrations(db_path: str, window: str, limit: int = 20):
-    async with aiosqlite.connect(db_path) as db:
-        if window == "24h":
-            # last 24h: leaderboard of tail numbers only
-            import time
-            since = int(time.time()) - 24 * 3600
-            q = (
-                "SELECT ar.registration as tail, COUNT(*) as c "
-                "FROM events e "
-                "JOIN aircraft_registry ar ON e.hex = ar.hex "
-                "WHERE e.observed_at >= ? AND ar.registration IS NOT NULL "
-                "GROUP BY ar.registration ORDER BY c DESC LIMIT ?"
-            )
-            async with db.execute(q, (since, limit)) as cur:
-                rows = await cur.fetchall()
-                return [dict(registration=tail, count=c) for tail, c in rows]
-        elif window == "30d":
-            # last 30d: leaderboard of tail numbers only
-            import time
-            since = int(time.time()) - 30 * 24 * 3600
-            q = (
-                "SELECT ar.registration as tail, COUNT(*) as c "
-                "FROM events e "
-                "JOIN aircraft_registry ar ON e.hex = ar.hex "
-                "WHERE e.observed_at >= ? AND ar.registration IS NOT NULL "
-                "GROUP BY ar.registration ORDER BY c DESC LIMIT ?"
-            )
-            async with db.execute(q, (since, limit)) as cur:
-                return [dict(registration=tail, count=c) for tail, c in await cur.fetchall()]
-        else:  # all
-            # all-time: leaderboard of tail numbers only
-            q = (
-                "SELECT ar.registration as tail, COUNT(*) as c "
-                "FROM events e "
-                "JOIN aircraft_registry ar ON e.hex = ar.hex "
-                "WHERE ar.registration IS NOT NULL "
-                "GROUP BY ar.registration ORDER BY c DESC LIMIT ?"
-            )
-            async with db.execute(q, (limit,)) as cur:
-                return [dict(registration=tail, count=c) for tail, c in await cur.fetchall()]
+    # Leaderboard of tail numbers only
+    async with read_conn(db_path) as db:
+        async with db.execute(_TOP_REGISTRATIONS_SQL, window_params(window) + (limit,)) as cur:
+            return [dict(registration=tail, count=c) for tail, c in await cur.fetchall()]
 
 # All-time daily records change slowly but each computation is a full-table
 # scan (~5s on the Pi). The dashboard polls this once a minute, so cache the
@@ -121,12 +308,11 @@ async def day_records(db_path: str, limit: int = 10):
     ):
         return _day_records_cache["data"]
 
-    async with aiosqlite.connect(db_path) as db:
-        # Days with the most distinct aircraft (by hex)
+    async with read_conn(db_path) as db:
+        # Days with the most distinct aircraft (one daily_summary row per day and hex)
         most_planes_q = (
-            "SELECT strftime('%Y-%m-%d', datetime(observed_at, 'unixepoch')) as day, "
-            "COUNT(DISTINCT hex) as c "
-            "FROM events "
+            "SELECT date as day, COUNT(*) as c "
+            "FROM daily_summary "
             "GROUP BY day ORDER BY c DESC, day DESC LIMIT ?"
         )
         async with db.execute(most_planes_q, (limit,)) as cur:
@@ -134,10 +320,10 @@ async def day_records(db_path: str, limit: int = 10):
 
         # Days with the most distinct aircraft types (by normalized type)
         most_types_q = (
-            "SELECT strftime('%Y-%m-%d', datetime(e.observed_at, 'unixepoch')) as day, "
+            "SELECT ds.date as day, "
             "COUNT(DISTINCT ar.normalized_type) as c "
-            "FROM events e "
-            "JOIN aircraft_registry ar ON e.hex = ar.hex "
+            "FROM daily_summary ds "
+            "JOIN aircraft_registry ar ON ds.hex = ar.hex "
             "WHERE ar.normalized_type IS NOT NULL "
             "GROUP BY day ORDER BY c DESC, day DESC LIMIT ?"
         )
@@ -149,7 +335,7 @@ async def day_records(db_path: str, limit: int = 10):
     return result
 
 async def recent_events(db_path: str, limit: int = 50):
-    async with aiosqlite.connect(db_path) as db:
+    async with read_conn(db_path) as db:
         # Join with aircraft_registry to include tail number as 'tail'
         q = (
             "SELECT e.observed_at, e.hex, COALESCE(ar.registration, e.registration) as tail, e.rssi, e.lat, e.lon "
@@ -165,14 +351,26 @@ async def recent_events(db_path: str, limit: int = 50):
                 for r in rows
             ]
 
+# Updates the row in place rather than deleting and re-inserting it (which is
+# what INSERT OR REPLACE does), and leaves it alone entirely when nothing but
+# the timestamp would change, so repeat lookups don't rewrite index entries
+_REGISTRY_UPSERT_SQL = (
+    "INSERT INTO aircraft_registry (hex, registration, aircraft_type, manufacturer, icao_type, normalized_type, last_updated) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(hex) DO UPDATE SET registration = excluded.registration, "
+    "aircraft_type = excluded.aircraft_type, manufacturer = excluded.manufacturer, "
+    "icao_type = excluded.icao_type, normalized_type = excluded.normalized_type, "
+    "last_updated = excluded.last_updated "
+    "WHERE registration IS NOT excluded.registration OR aircraft_type IS NOT excluded.aircraft_type "
+    "OR manufacturer IS NOT excluded.manufacturer OR icao_type IS NOT excluded.icao_type "
+    "OR normalized_type IS NOT excluded.normalized_type"
+)
+
 async def store_registration(db_path: str, hex_code: str, registration: str, 
                            aircraft_type: Optional[str] = None,
                            manufacturer: Optional[str] = None,
                            icao_type: Optional[str] = None):
     """Store a hex -> registration mapping with optional aircraft type data."""
-    import time
-    from .aircraft_type_normalizer import normalize_aircraft_type
-    
     # Compute normalized type for caching
     normalized = None
     if manufacturer or aircraft_type or icao_type:
@@ -180,16 +378,63 @@ async def store_registration(db_path: str, hex_code: str, registration: str,
         if normalized == "Unknown":
             normalized = None
     
-    async with aiosqlite.connect(db_path) as db:
+    hex_code = hex_code.upper()
+    async with write_conn(db_path) as db:
+        async with db.execute("SELECT 1 FROM aircraft_registry WHERE hex = ?", (hex_code,)) as cur:
+            is_new = await cur.fetchone() is None
+        await db.execute(
+            _REGISTRY_UPSERT_SQL,
+            (hex_code, registration.upper(), aircraft_type, manufacturer, icao_type, normalized, int(time.time()))
+        )
+    if is_new and db_path in _registry_counts:
+        _registry_counts[db_path] += 1
+
+async def registry_count(db_path: str) -> int:
+    """Number of rows in aircraft_registry, without scanning the table each time."""
+    count = _registry_counts.get(db_path)
+    if count is None:
+        # Count under the write lock so no store_registration lands in between
+        conn = await get_conn(db_path)
+        async with _lock(_write_locks, db_path):
+            async with conn.execute("SELECT COUNT(*) FROM aircraft_registry") as cur:
+                count = _registry_counts[db_path] = (await cur.fetchone())[0]
+    return count
+
+# Registry rows with type data but no cached normalized name yet
+NEEDS_NORMALIZED_TYPE_WHERE = (
+    "normalized_type IS NULL AND (manufacturer IS NOT NULL OR aircraft_type IS NOT NULL OR icao_type IS NOT NULL)"
+)
+
+async def backfill_normalized_types(db_path: str, limit: Optional[int] = None) -> int:
+    """Fill in normalized_type for registry rows that have type data but no
+    cached normalized name yet, at most `limit` of them if given. Returns the
+    number of rows updated."""
+    async with write_conn(db_path) as db:
+        async with db.execute(
+            "SELECT hex, manufacturer, aircraft_type, icao_type FROM aircraft_registry "
+            f"WHERE {NEEDS_NORMALIZED_TYPE_WHERE} LIMIT ?",
+            (-1 if limit is None else limit,)
+        ) as cur:
+            rows = await cur.fetchall()
+        updates = [
+            (normalized, row[0])
+            for row, normalized in zip(rows, normalize_many(row[1:] for row in rows))
+            if normalized and normalized != "Unknown"
+        ]
+        await db.executemany("UPDATE aircraft_registry SET normalized_type = ? WHERE hex = ?", updates)
+    return len(updates)
+
+async def store_lookup_miss(db_path: str, hex_code: str):
+    """Remember that a registration lookup for hex_code found nothing."""
+    async with write_conn(db_path) as db:
         await db.execute(
-            "INSERT OR REPLACE INTO aircraft_registry (hex, registration, aircraft_type, manufacturer, icao_type, normalized_type, last_updated) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (hex_code.upper(), registration.upper(), aircraft_type, manufacturer, icao_type, normalized, int(time.time()))
+            "INSERT OR REPLACE INTO lookup_misses (hex, checked_at) VALUES (?, ?)",
+            (hex_code.upper(), int(time.time()))
         )
-        await db.commit()
 
 async def get_registration_for_hex(db_path: str, hex_code: str) -> Optional[str]:
     """Get registration for a hex code from the registry."""
-    async with aiosqlite.connect(db_path) as db:
+    async with read_conn(db_path) as db:
         async with db.execute(
             "SELECT registration FROM aircraft_registry WHERE hex = ?",
             (hex_code.upper(),)
@@ -1,7 +1,7 @@
 import asyncio
 import os
 import yaml
-from .db import ensure_db
+from .db import ensure_db, close_db
 
 def load_config() -> dict:
     cfg_path = os.environ.get("TL_CONFIG", os.path.join(os.path.dirname(__file__), "config.yaml"))
@@ -16,6 +16,7 @@ async def main():
     os.makedirs(data_dir, exist_ok=True)
     db_path = os.path.join(data_dir, "tailleader.sqlite")
     await ensure_db(db_path)
+    await close_db()
     print(f"Initialized DB at {db_path}")
 
 if __name__ == "__main__":
@@ -1,39 +1,127 @@
 import asyncio
+import json
 import logging
 import time
 import httpx
 import yaml
 import os
+from itertools import islice
 from typing import Optional
-from .db import insert_event
-from .aircraft_db import lookup_registration, get_cached_registration
+from .db import insert_events, read_conn, store_registration, store_lookup_miss
+from .aircraft_db import lookup_registration, get_cached_registration, is_cached, retry_deferred
+from .aircraft_db import load_cache_from_db, load_misses_from_db, MISS_TTL
+
+class SeenAircraft(dict):
+    """hex -> (registration, rssi, lat, lon, track, last_seen) for aircraft in
+    coverage, that also tracks which hexes still have no registration so the
+    lookup refresher and stats don't have to scan every entry.
+
+    `version` changes on every write so readers can cache views of it."""
+
+    def __init__(self):
+        super().__init__()
+        self.pending = set()
+        self.version = 0
+
+    def __setitem__(self, hex_id, entry):
+        super().__setitem__(hex_id, entry)
+        self.version += 1
+        if entry[0]:
+            self.pending.discard(hex_id)
+        else:
+            self.pending.add(hex_id)
+
+    def __delitem__(self, hex_id):
+        super().__delitem__(hex_id)
+        self.version += 1
+        self.pending.discard(hex_id)
+
+    # The remaining dict mutators would bypass the two methods above, so
+    # route them through those or keep pending/version in step directly
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+        self.pending.clear()
+
+    def pop(self, hex_id, *default):
+        if hex_id not in self:
+            return super().pop(hex_id, *default)
+        entry = super().__getitem__(hex_id)
+        del self[hex_id]
+        return entry
+
+    def popitem(self):
+        hex_id, entry = super().popitem()
+        self.version += 1
+        self.pending.discard(hex_id)
+        return hex_id, entry
+
+    def setdefault(self, hex_id, entry):
+        if hex_id not in self:
+            self[hex_id] = entry
+        return super().__getitem__(hex_id)
+
+    def update(self, *args, **kwargs):
+        for hex_id, entry in dict(*args, **kwargs).items():
+            self[hex_id] = entry
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
 
 # Global cache: hex -> (registration, last_rssi, last_lat, last_lon, last_track, last_observed_at)
 # Used to detect when an aircraft enters/leaves coverage
 # Only one event logged per continuous flight session
-seen_aircraft = {}
+seen_aircraft = SeenAircraft()
 
 logger = logging.getLogger(__name__)
 
+# Background registration lookups: one task per hex at a time, and at most
+# MAX_BACKGROUND_LOOKUPS of them talking to the API at once
+MAX_BACKGROUND_LOOKUPS = 4
+_lookup_tasks = {}
+_lookup_sem: Optional[asyncio.Semaphore] = None
+
 def normalize_registration(reg: Optional[str]) -> Optional[str]:
     """Extract and normalize flight/callsign from the registration field."""
     if not reg:
         return None
-    s = reg.strip().upper()
+    s = reg.strip()
+    # Filter out very short/invalid callsigns before copying anything
+    if len(s) < 2:
+        return None
     # Keep registration as-is (e.g., AAL1945, DAL895)
-    # Filter out very short/invalid callsigns
-    if len(s) >= 2:
-        return s
-    return None
+    return s.upper()
+
+def schedule_lookup(hex_id: str, db_path: Optional[str] = None):
+    """Start a background lookup for hex_id unless one is already queued, its
+    answer (including a remembered miss) is already cached, or it failed
+    transiently within the last TRANSIENT_RETRY_AFTER seconds."""
+    if hex_id in _lookup_tasks or is_cached(hex_id) or retry_deferred(hex_id):
+        return
+    task = asyncio.create_task(lookup_and_cache(hex_id, db_path))
+    _lookup_tasks[hex_id] = task
+    task.add_done_callback(lambda _: _lookup_tasks.pop(hex_id, None))
 
 async def lookup_and_cache(hex_id: str, db_path: Optional[str] = None):
     """Background task to lookup and cache registration and aircraft type."""
+    global _lookup_sem
+    if _lookup_sem is None:
+        # Created lazily so it belongs to the running event loop
+        _lookup_sem = asyncio.Semaphore(MAX_BACKGROUND_LOOKUPS)
     try:
-        result = await lookup_registration(hex_id)
+        async with _lookup_sem:
+            fresh = not is_cached(hex_id)
+            result = await lookup_registration(hex_id)
         if result and db_path:
-            from .db import store_registration
             reg, aircraft_type, manufacturer, icao_type = result
             await store_registration(db_path, hex_id, reg, aircraft_type, manufacturer, icao_type)
+        elif fresh and db_path and is_cached(hex_id):
+            # Only persist definitive misses that actually went to the network
+            # (transient failures are not cached, so is_cached() is False)
+            await store_lookup_miss(db_path, hex_id)
     except Exception:
         pass
 
@@ -41,17 +129,20 @@ async def periodic_lookup_refresher(db_path: str):
     """Periodically retry tail lookups for aircraft without a known registration."""
     while True:
         try:
-            # collect hexes without registration
-            unknown_hexes = [hex_id for hex_id, (reg, *_rest) in seen_aircraft.items() if not reg]
-            # limit per cycle to avoid hammering the API
-            for hex_id in unknown_hexes[:20]:
-                asyncio.create_task(lookup_and_cache(hex_id, db_path))
+            # hexes still without a registration, limited per cycle to avoid
+            # hammering the API
+            for hex_id in list(islice(seen_aircraft.pending, 20)):
+                schedule_lookup(hex_id, db_path)
         except Exception:
             pass
         await asyncio.sleep(60)
 
-async def poll_once(config: dict, db_path: str):
-    global seen_aircraft
+def _read_feed_file(path: str):
+    with open(path, "rb") as f:
+        return json.loads(f.read())
+
+
+async def poll_once(config: dict, db_path: str, client: httpx.AsyncClient):
     feeder = config.get("feeder", {})
     mode = feeder.get("mode", "http")
     now = int(time.time())
@@ -61,27 +152,28 @@ async def poll_once(config: dict, db_path: str):
         if not url:
             return
         try:
-            async with httpx.AsyncClient(timeout=3.0) as client:
-                r = await client.get(url)
-                r.raise_for_status()
-                data = r.json()
+            r = await client.get(url)
+            r.raise_for_status()
+            data = r.json()
         except Exception:
             return
     elif mode == "file":
         path = feeder.get("path")
         if not path or not os.path.exists(path):
             return
-        import json
         try:
-            with open(path, "r") as f:
-                data = json.load(f)
+            # Read and parse in a worker thread so a slow disk can't stall the loop
+            data = await asyncio.to_thread(_read_feed_file, path)
         except Exception:
             return
     else:
         return
 
     ac_list = data.get("aircraft") or data.get("ac") or []
-    current_hexes = set()
+    # Arrivals are written together once the whole snapshot is processed, and
+    # only join seen_aircraft once that write has succeeded
+    new_events = []
+    arrivals = {}
 
     # Track currently visible aircraft
     for ac in ac_list:
@@ -90,7 +182,6 @@ async def poll_once(config: dict, db_path: str):
             continue
         
         hex_id = hex_id.upper()
-        current_hexes.add(hex_id)
         rssi = ac.get("rssi")
         lat = ac.get("lat")
         lon = ac.get("lon")
@@ -104,20 +195,15 @@ async def poll_once(config: dict, db_path: str):
                 reg = cached_reg
             else:
                 # Async lookup (don't block the poller)
-                asyncio.create_task(lookup_and_cache(hex_id, db_path))
+                schedule_lookup(hex_id, db_path)
         
         # If we haven't seen this aircraft before, log arrival with registration
-        if hex_id not in seen_aircraft:
-            event = {
-                "observed_at": now,
-                "hex": hex_id,
-                "registration": reg,
-                "rssi": rssi,
-                "lat": lat,
-                "lon": lon,
-            }
-            await insert_event(db_path, event)
-            seen_aircraft[hex_id] = (reg, rssi, lat, lon, track, now)
+        if hex_id in arrivals:
+            # Listed twice in one snapshot; keep the single arrival
+            arrivals[hex_id] = (reg or arrivals[hex_id][0], rssi, lat, lon, track, now)
+        elif hex_id not in seen_aircraft:
+            new_events.append((now, hex_id, reg, rssi, lat, lon))
+            arrivals[hex_id] = (reg, rssi, lat, lon, track, now)
         else:
             # Update cache only; no additional inserts during continuous session.
             old_reg, old_rssi, old_lat, old_lon, old_track, old_time = seen_aircraft[hex_id]
@@ -125,23 +211,33 @@ async def poll_once(config: dict, db_path: str):
             # Always update the cache
             seen_aircraft[hex_id] = (reg or old_reg, rssi, lat, lon, track, now)
 
-    # Check for aircraft that disappeared (last seen > 10 minutes ago)
-    disappeared = [hex_id for hex_id in list(seen_aircraft.keys()) 
-                   if hex_id not in current_hexes and (now - seen_aircraft[hex_id][5]) > 600]
-    
-    for hex_id in disappeared:
-        # Aircraft has left coverage; end session so next reappearance logs a new arrival.
-        del seen_aircraft[hex_id]
+    # If this raises (e.g. database locked), the arrivals stay out of
+    # seen_aircraft and are logged again on the next poll
+    await insert_events(db_path, new_events)
+    for hex_id, entry in arrivals.items():
+        seen_aircraft[hex_id] = entry
+
+    # Drop aircraft not seen for 10 minutes; everything in this snapshot was
+    # just stamped with `now`, so the timestamp alone tells who has left.
+    # Ending the session means the next reappearance logs a new arrival.
+    expire_before = now - 600
+    for hex_id, entry in list(seen_aircraft.items()):
+        if entry[5] < expire_before:
+            del seen_aircraft[hex_id]
 
 async def run_poller(config: dict, db_path: str):
-    global seen_aircraft
-    
     # On startup, load recently seen aircraft from DB to avoid duplicate logging
-    import aiosqlite
     try:
-        async with aiosqlite.connect(db_path) as db:
+        async with read_conn(db_path) as db:
             # Load registration cache from database
-            from .aircraft_db import load_cache_from_db
+            async with db.execute(
+                "SELECT hex, checked_at FROM lookup_misses WHERE checked_at > ? AND hex NOT IN (SELECT hex FROM aircraft_registry)",
+                (int(time.time()) - MISS_TTL,)
+            ) as cur:
+                misses = {row[0]: row[1] for row in await cur.fetchall()}
+                if misses:
+                    load_misses_from_db(misses)
+                    logger.info(f"Loaded {len(misses)} recent lookup misses from cache")
             async with db.execute("SELECT hex, registration, aircraft_type, manufacturer, icao_type FROM aircraft_registry") as cur:
                 registry = {row[0]: (row[1], row[2], row[3], row[4]) for row in await cur.fetchall()}
                 if registry:
@@ -149,10 +245,12 @@ async def run_poller(config: dict, db_path: str):
                     logger.info(f"Loaded {len(registry)} registrations from cache")
             
             # Get aircraft seen in the last 30 minutes to avoid duplicate arrivals after restarts
-            import time
+            # Only the last half hour is read off idx_events_time_hex; left to
+            # itself the planner skip-scans idx_events_hex_time over every hex
             cutoff = int(time.time()) - 1800
             async with db.execute(
-                "SELECT hex, registration, MAX(observed_at) FROM events WHERE observed_at > ? GROUP BY hex",
+                "SELECT hex, registration, MAX(observed_at) FROM events INDEXED BY idx_events_time_hex "
+                "WHERE observed_at > ? GROUP BY hex",
                 (cutoff,)
             ) as cur:
                 rows = await cur.fetchall()
@@ -163,10 +261,13 @@ async def run_poller(config: dict, db_path: str):
         logger.error(f"Startup cache load error: {e}")
     
     interval = int(config.get("feeder", {}).get("interval_seconds", 10))
-    while True:
-        try:
-            await poll_once(config, db_path)
-        except Exception:
-            pass
-        await asyncio.sleep(interval)
+    # One client for the life of the poller so the feed connection is kept
+    # alive between polls instead of being set up every interval
+    async with httpx.AsyncClient(timeout=3.0) as client:
+        while True:
+            try:
+                await poll_once(config, db_path, client)
+            except Exception:
+                pass
+            await asyncio.sleep(interval)
 
@@ -0,0 +1,86 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from tailleader import db, poller
+
+
+class PollOnceArrivalsTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "tailleader.sqlite")
+        feed = os.path.join(self.tmp.name, "aircraft.json")
+        with open(feed, "w") as f:
+            json.dump({"aircraft": [
+                {"hex": "a1b2c3", "flight": "AAL123 ", "lat": 40.1, "lon": -74.2},
+                {"hex": "abcdef", "flight": "N12345", "lat": 41.0, "lon": -73.0},
+            ]}, f)
+        self.config = {"feeder": {"mode": "file", "path": feed}}
+        await db.ensure_db(self.db_path)
+        poller.seen_aircraft.clear()
+
+    async def asyncTearDown(self):
+        poller.seen_aircraft.clear()
+        await db.close_db()
+        self.tmp.cleanup()
+
+    def logged_hexes(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return sorted(row[0] for row in conn.execute("SELECT hex FROM events"))
+
+    async def test_failed_insert_is_logged_on_next_poll(self):
+        failing = mock.AsyncMock(side_effect=sqlite3.OperationalError("database is locked"))
+        with mock.patch.object(poller, "insert_events", failing):
+            with self.assertRaises(sqlite3.OperationalError):
+                await poller.poll_once(self.config, self.db_path, None)
+        self.assertNotIn("A1B2C3", poller.seen_aircraft)
+        self.assertEqual(self.logged_hexes(), [])
+
+        await poller.poll_once(self.config, self.db_path, None)
+        self.assertEqual(self.logged_hexes(), ["A1B2C3", "ABCDEF"])
+        self.assertIn("A1B2C3", poller.seen_aircraft)
+
+        # Still in coverage, so no second arrival
+        await poller.poll_once(self.config, self.db_path, None)
+        self.assertEqual(self.logged_hexes(), ["A1B2C3", "ABCDEF"])
+
+
+class SeenAircraftTest(unittest.TestCase):
+    def setUp(self):
+        self.seen = poller.SeenAircraft()
+        self.seen["A1B2C3"] = (None, None, None, None, None, 0)
+        self.seen["ABCDEF"] = ("N12345", None, None, None, None, 0)
+        self.seen["C0FFEE"] = (None, None, None, None, None, 0)
+
+    def test_clear_resets_pending_and_bumps_version(self):
+        version = self.seen.version
+        self.seen.clear()
+        self.assertEqual(self.seen.pending, set())
+        self.assertGreater(self.seen.version, version)
+
+    def test_pop_and_popitem_drop_pending(self):
+        version = self.seen.version
+        self.assertEqual(self.seen.pop("A1B2C3")[0], None)
+        self.assertEqual(self.seen.pending, {"C0FFEE"})
+        self.assertGreater(self.seen.version, version)
+        self.assertIsNone(self.seen.pop("MISSING", None))
+        with self.assertRaises(KeyError):
+            self.seen.pop("MISSING")
+        hex_id, _ = self.seen.popitem()
+        self.assertNotIn(hex_id, self.seen.pending)
+        self.assertEqual(self.seen.pending, set(self.seen) & {"C0FFEE"})
+
+    def test_update_and_setdefault_track_pending(self):
+        self.seen.update({"ABCDEF": (None, None, None, None, None, 1)})
+        self.assertIn("ABCDEF", self.seen.pending)
+        self.seen.setdefault("D00D00", (None, None, None, None, None, 1))
+        self.assertIn("D00D00", self.seen.pending)
+        self.seen |= {"D00D00": ("N1", None, None, None, None, 2)}
+        self.assertNotIn("D00D00", self.seen.pending)
+
+
+if __name__ == "__main__":
+    unittest.main()